@@ -3,6 +3,7 @@ E-commerce Product Data Aggregation API
 MCP-ready for AI shopping agents
 """
 
+import asyncio
 import os
 from datetime import datetime, timedelta
 from typing import List, Optional
@@ -10,8 +11,9 @@ from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, HTTPException, Query, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 from dotenv import load_dotenv
+from fastapi_cache.decorator import cache
 
 from src.models.product import (
     Product,
@@ -21,6 +23,14 @@ from src.models.product import (
     PriceAlert
 )
 from src.utils.data_manager import DataManager
+from src.utils.cache import (
+    init_cache,
+    SEARCH_NAMESPACE,
+    STATS_NAMESPACE,
+    PRICE_HISTORY_NAMESPACE,
+    SEARCH_EXPIRE,
+    STATS_EXPIRE
+)
 
 load_dotenv()
 
@@ -32,6 +42,7 @@ data_manager = DataManager()
 async def lifespan(app: FastAPI):
     """Startup and shutdown"""
     print("🛒 E-commerce Product API starting...")
+    init_cache()
     await data_manager.initialize()
     print(f"✅ Loaded {await data_manager.count()} products")
     yield
@@ -44,6 +55,7 @@ app = FastAPI(
     description="Real-time product data for price monitoring and competitive intelligence. MCP-ready for AI shopping agents.",
     version="1.0.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
     docs_url="/docs",
     redoc_url="/redoc"
 )
@@ -79,7 +91,12 @@ async def health():
 
 
 # Product Endpoints
-@app.get("/api/v1/products/search", response_model=ProductSearchResponse, tags=["Products"])
+@app.get(
+    "/api/v1/products/search",
+    responses={200: {"model": ProductSearchResponse}},
+    tags=["Products"]
+)
+@cache(expire=SEARCH_EXPIRE, namespace=SEARCH_NAMESPACE)
 async def search_products(
     q: Optional[str] = Query(None, description="Search term"),
     category: Optional[ProductCategory] = None,
@@ -111,18 +128,18 @@ async def search_products(
     
     filters = {k: v for k, v in filters.items() if v is not None}
     
-    results = await data_manager.search(filters, limit=limit, offset=offset)
-    total = await data_manager.count_filtered(filters)
+    results, total = await data_manager.search_with_count(filters, limit=limit, offset=offset)
     
-    return ProductSearchResponse(
-        total=total,
-        limit=limit,
-        offset=offset,
-        results=results
-    )
+    # Products are already validated - dump once and let orjson serialize
+    return ORJSONResponse(content={
+        "total": total,
+        "limit": limit,
+        "offset": offset,
+        "results": [product.model_dump(mode='json') for product in results]
+    })
 
 
-@app.get("/api/v1/products/{product_id}", response_model=Product, tags=["Products"])
+@app.get("/api/v1/products/{product_id}", responses={200: {"model": Product}}, tags=["Products"])
 async def get_product(product_id: str):
     """Get detailed product information"""
     product = await data_manager.get_by_id(product_id)
@@ -133,33 +150,40 @@ async def get_product(product_id: str):
             detail=f"Product '{product_id}' not found"
         )
     
-    return product
+    return ORJSONResponse(content=product.model_dump(mode='json'))
 
 
-@app.get("/api/v1/products/category/{category}", response_model=List[Product], tags=["Products"])
+@app.get(
+    "/api/v1/products/category/{category}",
+    responses={200: {"model": List[Product]}},
+    tags=["Products"]
+)
+@cache(expire=SEARCH_EXPIRE, namespace=SEARCH_NAMESPACE)
 async def get_products_by_category(
     category: ProductCategory,
     limit: int = Query(20, ge=1, le=100)
 ):
     """Get products by category"""
     results = await data_manager.get_by_category(category, limit=limit)
-    return results
+    return ORJSONResponse(content=[product.model_dump(mode='json') for product in results])
 
 
 # Price Tracking
 @app.get("/api/v1/products/{product_id}/price-history", tags=["Price Tracking"])
+@cache(expire=SEARCH_EXPIRE, namespace=PRICE_HISTORY_NAMESPACE)
 async def get_price_history(
     product_id: str,
     days: int = Query(30, ge=1, le=365)
 ):
     """Get price history for a product"""
-    product = await data_manager.get_by_id(product_id)
+    product, history = await asyncio.gather(
+        data_manager.get_by_id(product_id, include_history=False),
+        data_manager.get_price_history(product_id, days=days)
+    )
     
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
     
-    history = await data_manager.get_price_history(product_id, days=days)
-    
     return {
         "product_id": product_id,
         "product_name": product.name,
@@ -187,11 +211,8 @@ async def compare_products(product_ids: List[str]):
     if len(product_ids) > 10:
         raise HTTPException(status_code=400, detail="Maximum 10 products for comparison")
     
-    products = []
-    for pid in product_ids:
-        product = await data_manager.get_by_id(pid)
-        if product:
-            products.append(product)
+    products_map = await data_manager.get_many(product_ids)
+    products = [products_map[pid] for pid in product_ids if pid in products_map]
     
     if not products:
         raise HTTPException(status_code=404, detail="None of the products found")
@@ -206,7 +227,7 @@ async def compare_products(product_ids: List[str]):
 @app.get("/api/v1/products/{product_id}/reviews/sentiment", tags=["Reviews"])
 async def get_review_sentiment(product_id: str):
     """Get review sentiment analysis for a product"""
-    product = await data_manager.get_by_id(product_id)
+    product = await data_manager.get_by_id(product_id, include_history=False)
     
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
@@ -222,17 +243,20 @@ async def get_review_sentiment(product_id: str):
 
 # Statistics
 @app.get("/api/v1/stats/overview", tags=["Statistics"])
+@cache(expire=STATS_EXPIRE, namespace=STATS_NAMESPACE)
 async def get_stats():
     """Get API statistics"""
-    total = await data_manager.count()
-    categories = await data_manager.get_category_distribution()
-    price_stats = await data_manager.get_price_stats()
+    total, categories, price_stats = await asyncio.gather(
+        data_manager.count(),
+        data_manager.get_category_distribution(),
+        data_manager.get_price_stats()
+    )
     
     return {
         "total_products": total,
         "categories": categories,
         "price_stats": price_stats,
-        "last_updated": datetime.utcnow()
+        "last_updated": datetime.utcnow().isoformat()
     }
 
 
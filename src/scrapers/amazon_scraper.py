@@ -4,14 +4,26 @@ Scrapes product data from Amazon (public data only)
 FREE - Uses web scraping (no API key needed for basic data)
 """
 
+import asyncio
+import functools
+import itertools
 import requests
-from bs4 import BeautifulSoup
+import httpx
+from selectolax.lexbor import LexborHTMLParser
 import time
 import random
 from datetime import datetime
 from typing import List, Optional
 import re
 
+from pydantic import HttpUrl, TypeAdapter, ValidationError
+
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
 from src.models.product import (
     Product,
     ProductCategory,
@@ -22,11 +34,76 @@ from src.models.product import (
     Currency
 )
 
+# CSS selectors for Amazon search result markup
+# Note: Amazon's HTML structure changes frequently
+# This is a simplified version - production would need more robust selectors
+CARD_SELECTOR = 'div[data-component-type="s-search-result"]'
+NAME_SELECTOR = 'h2'
+PRICE_SELECTOR = 'span.a-price'
+PRICE_WHOLE_SELECTOR = 'span.a-price-whole'
+PRICE_FRACTION_SELECTOR = 'span.a-price-fraction'
+RATING_SELECTOR = 'span.a-icon-alt'
+REVIEW_COUNT_SELECTOR = 'span.a-size-base'
+IMAGE_SELECTOR = 'img.s-image'
+LINK_SELECTOR = 'a.a-link-normal'
+
+MAX_NAME_LENGTH = 500  # Product.name max_length
+HTTP_URL_ADAPTER = TypeAdapter(HttpUrl)
+
+RATING_RE = re.compile(r'([\d.]+) out of')
+INT_RE = re.compile(r'(\d+)')
+
+# Keyword -> category rules, in priority order (first matching category wins)
+CATEGORY_KEYWORDS = [
+    (ProductCategory.COMPUTERS, ['laptop', 'computer', 'macbook', 'pc']),
+    (ProductCategory.SMARTPHONES, ['phone', 'iphone', 'android', 'samsung']),
+    (ProductCategory.BOOKS, ['book', 'novel', 'kindle']),
+    (ProductCategory.FASHION, ['clothes', 'shirt', 'pants', 'dress', 'fashion']),
+    (ProductCategory.TOYS, ['toy', 'game', 'lego', 'doll']),
+    (ProductCategory.HOME, ['kitchen', 'home', 'furniture', 'decor']),
+]
+
+
+def _build_category_automaton():
+    """Build an Aho-Corasick automaton matching every category keyword in one pass"""
+    automaton = ahocorasick.Automaton()
+    for priority, (category, keywords) in enumerate(CATEGORY_KEYWORDS):
+        for word in keywords:
+            automaton.add_word(word, (priority, category))
+    automaton.make_automaton()
+    return automaton
+
+
+CATEGORY_AUTOMATON = _build_category_automaton() if AHOCORASICK_AVAILABLE else None
+
+
+@functools.lru_cache(maxsize=4096)
+def _determine_category_cached(name_lower: str) -> ProductCategory:
+    """Determine product category from a lowercased name (memoized per title)"""
+    if CATEGORY_AUTOMATON is not None:
+        # Single pass over the name; lowest priority index wins
+        matches = [match for _, match in CATEGORY_AUTOMATON.iter(name_lower)]
+        if matches:
+            return min(matches, key=lambda match: match[0])[1]
+        return ProductCategory.ELECTRONICS
+    
+    # Simple keyword matching
+    for category, keywords in CATEGORY_KEYWORDS:
+        if any(word in name_lower for word in keywords):
+            return category
+    
+    return ProductCategory.ELECTRONICS
+
 
 class AmazonScraper:
     """Scrape product data from Amazon"""
     
     BASE_URL = "https://www.amazon.com"
+    HEADERS = {
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+        'Accept-Language': 'en-US,en;q=0.9',
+        'Accept': 'text/html,application/xhtml+xml',
+    }
     
     def __init__(self, delay_min=3, delay_max=6):
         """
@@ -39,16 +116,31 @@ class AmazonScraper:
         self.delay_min = delay_min
         self.delay_max = delay_max
         self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-            'Accept-Language': 'en-US,en;q=0.9',
-            'Accept': 'text/html,application/xhtml+xml',
-        })
+        self.session.headers.update(self.HEADERS)
     
     def _delay(self):
         """Random delay to be respectful"""
         time.sleep(random.uniform(self.delay_min, self.delay_max))
     
+    def _build_search_url(self, query: str, category: str = None) -> str:
+        """Build Amazon search URL"""
+        search_url = f"{self.BASE_URL}/s?k={query.replace(' ', '+')}"
+        if category:
+            search_url += f"&i={category}"
+        return search_url
+    
+    def _iter_products(self, tree: LexborHTMLParser, limit: int):
+        """Yield parsed products from a search results page"""
+        # Lexbor's css() returns every match at once (there is no lazy
+        # matcher), so islice only bounds how many cards get parsed
+        for card in itertools.islice(tree.css(CARD_SELECTOR), limit):
+            product = self._parse_product_card(card)
+            if product is None:
+                continue
+            
+            print(f"  ✅ Found: {product.name[:50]}...")
+            yield product
+    
     def search_products(
         self,
         query: str,
@@ -71,32 +163,16 @@ class AmazonScraper:
         print(f"🔍 Searching Amazon for: {query}")
         
         try:
-            # Build search URL
-            search_url = f"{self.BASE_URL}/s?k={query.replace(' ', '+')}"
-            if category:
-                search_url += f"&i={category}"
+            search_url = self._build_search_url(query, category)
             
             response = self.session.get(search_url, timeout=30)
             response.raise_for_status()
             
-            soup = BeautifulSoup(response.content, 'html.parser')
+            tree = LexborHTMLParser(response.content)
+            products.extend(self._iter_products(tree, limit))
             
-            # Find product cards
-            # Note: Amazon's HTML structure changes frequently
-            # This is a simplified version - production would need more robust selectors
-            product_cards = soup.find_all('div', {'data-component-type': 's-search-result'})[:limit]
-            
-            for card in product_cards:
-                try:
-                    product = self._parse_product_card(card)
-                    if product:
-                        products.append(product)
-                        print(f"  ✅ Found: {product.name[:50]}...")
-                        self._delay()
-                
-                except Exception as e:
-                    print(f"  ⚠️  Error parsing product: {e}")
-                    continue
+            # Be respectful between requests (parsing needs no delay)
+            self._delay()
         
         except Exception as e:
             print(f"  ❌ Search failed: {e}")
@@ -104,145 +180,220 @@ class AmazonScraper:
         return products
     
     def _parse_product_card(self, card) -> Optional[Product]:
-        """Parse Amazon product card HTML"""
-        try:
-            # Extract ASIN (Amazon Standard Identification Number)
-            asin = card.get('data-asin')
-            if not asin:
-                return None
-            
-            # Extract name
-            name_elem = card.find('h2')
-            if not name_elem:
-                return None
-            name = name_elem.text.strip()
+        """
+        Parse Amazon product card HTML
+        
+        Cards missing required fields are common, so they return None
+        instead of raising. Models are assembled with model_construct after
+        a single sanitization step - scraped data is validated here, not
+        field by field by Pydantic.
+        """
+        # Extract ASIN (Amazon Standard Identification Number)
+        asin = card.attributes.get('data-asin')
+        if not asin:
+            return None
+        
+        # Extract name
+        name_elem = card.css_first(NAME_SELECTOR)
+        if not name_elem:
+            return None
+        name = name_elem.text().strip()
+        if not name:
+            return None
+        
+        # Extract product URL (required for the source)
+        link_elem = card.css_first(LINK_SELECTOR)
+        if not link_elem:
+            return None
+        product_url = f"{self.BASE_URL}{link_elem.attributes.get('href')}"
+        
+        # Extract price
+        current_price = 0.0
+        price_elem = card.css_first(PRICE_SELECTOR)
+        price_whole = price_elem.css_first(PRICE_WHOLE_SELECTOR) if price_elem else None
+        if price_whole:
+            price_str = price_whole.text().replace(',', '').replace('$', '')
+            price_fraction = price_elem.css_first(PRICE_FRACTION_SELECTOR)
+            if price_fraction:
+                price_str += price_fraction.text()
             
-            # Extract price
-            price_elem = card.find('span', {'class': 'a-price'})
-            if price_elem:
-                price_whole = price_elem.find('span', {'class': 'a-price-whole'})
-                price_fraction = price_elem.find('span', {'class': 'a-price-fraction'})
-                
-                if price_whole:
-                    price_str = price_whole.text.replace(',', '').replace('$', '')
-                    if price_fraction:
-                        price_str += price_fraction.text
-                    
-                    try:
-                        current_price = float(price_str)
-                    except:
-                        current_price = 0.0
-                else:
-                    current_price = 0.0
-            else:
+            try:
+                current_price = float(price_str)
+            except ValueError:
                 current_price = 0.0
-            
-            # Extract rating
-            rating_elem = card.find('span', {'class': 'a-icon-alt'})
-            if rating_elem:
-                rating_text = rating_elem.text
-                rating_match = re.search(r'([\d.]+) out of', rating_text)
-                if rating_match:
-                    rating = float(rating_match.group(1))
-                else:
-                    rating = 0.0
-            else:
-                rating = 0.0
-            
-            # Extract review count
-            review_elem = card.find('span', {'class': 'a-size-base'})
-            if review_elem:
-                review_text = review_elem.text.replace(',', '')
-                review_match = re.search(r'(\d+)', review_text)
-                if review_match:
-                    review_count = int(review_match.group(1))
-                else:
-                    review_count = 0
-            else:
-                review_count = 0
-            
-            # Extract image
-            img_elem = card.find('img', {'class': 's-image'})
-            image_url = img_elem.get('src') if img_elem else None
-            
-            # Extract product URL
-            link_elem = card.find('a', {'class': 'a-link-normal'})
-            product_url = f"{self.BASE_URL}{link_elem.get('href')}" if link_elem else None
-            
-            # Determine category (simplified)
-            category = self._determine_category(name)
-            
-            # Create product ID
-            product_id = f"prod_amz_{asin}"
-            
-            # Create availability
-            availability = Availability(
-                in_stock=current_price > 0,
-                stock_level=StockLevel.IN_STOCK if current_price > 0 else StockLevel.OUT_OF_STOCK,
-                shipping_time="Varies"
+        
+        # Extract rating
+        rating = 0.0
+        rating_elem = card.css_first(RATING_SELECTOR)
+        rating_match = RATING_RE.search(rating_elem.text()) if rating_elem else None
+        if rating_match:
+            try:
+                rating = float(rating_match.group(1))
+            except ValueError:
+                return None
+        
+        # Extract review count
+        review_count = 0
+        review_elem = card.css_first(REVIEW_COUNT_SELECTOR)
+        review_match = INT_RE.search(review_elem.text().replace(',', '')) if review_elem else None
+        if review_match:
+            review_count = int(review_match.group(1))
+        
+        # Extract image
+        img_elem = card.css_first(IMAGE_SELECTOR)
+        image_url = img_elem.attributes.get('src') if img_elem else None
+        
+        # Sanitize once, then build models without re-validating every field
+        if len(name) > MAX_NAME_LENGTH or rating > 5:
+            return None
+        current_price = max(current_price, 0.0)
+        try:
+            product_url = HTTP_URL_ADAPTER.validate_python(product_url)
+            images = [HTTP_URL_ADAPTER.validate_python(image_url)] if image_url else []
+        except ValidationError:
+            return None
+        
+        # Determine category (simplified)
+        category = _determine_category_cached(name.lower())
+        
+        # Create product ID
+        product_id = f"prod_amz_{asin}"
+        now = datetime.utcnow()
+        
+        # Create availability
+        availability = Availability.model_construct(
+            in_stock=current_price > 0,
+            stock_level=StockLevel.IN_STOCK if current_price > 0 else StockLevel.OUT_OF_STOCK,
+            shipping_time="Varies"
+        )
+        
+        # Create ratings
+        ratings = None
+        if rating > 0:
+            ratings = Ratings.model_construct(
+                average=rating,
+                count=review_count
             )
+        
+        # Create source
+        source = ProductSource.model_construct(
+            name="Amazon",
+            url=product_url,
+            price=current_price,
+            availability=availability,
+            last_checked=now
+        )
+        
+        # Create product
+        return Product.model_construct(
+            id=product_id,
+            name=name,
+            slug=name.lower().replace(' ', '-')[:50],
+            category=category,
+            brand=None,  # Would need to extract from product page
+            current_price=current_price,
+            currency=Currency.USD,
+            availability=availability,
+            ratings=ratings,
+            images=images,
+            asin=str(asin),
+            sources=[source],
+            first_seen=now,
+            last_updated=now,
+            data_quality_score=40  # Low score for basic scraping
+        )
+    
+    def _determine_category(self, name: str) -> ProductCategory:
+        """Determine product category from name"""
+        return _determine_category_cached(name.lower())
+
+
+class AsyncAmazonScraper(AmazonScraper):
+    """
+    Async Amazon scraper
+    Runs several searches concurrently over one pooled HTTP/2 client
+    """
+    
+    def __init__(self, delay_min=3, delay_max=6, concurrency=3):
+        """
+        Initialize scraper
+        
+        Args:
+            delay_min: Minimum delay between requests (seconds)
+            delay_max: Maximum delay between requests (seconds)
+            concurrency: Maximum in-flight requests to Amazon
+        """
+        self.delay_min = delay_min
+        self.delay_max = delay_max
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.client: Optional[httpx.AsyncClient] = None
+    
+    async def __aenter__(self):
+        await self.initialize()
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+    
+    async def initialize(self):
+        """Open the HTTP client (keep-alive pool, HTTP/2 multiplexing)"""
+        self.client = httpx.AsyncClient(
+            http2=True,
+            headers=self.HEADERS,
+            timeout=30,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=20)
+        )
+    
+    async def close(self):
+        """Close the HTTP client"""
+        if self.client:
+            await self.client.aclose()
+            self.client = None
+    
+    async def _delay(self):
+        """Random delay to be respectful (without blocking the event loop)"""
+        await asyncio.sleep(random.uniform(self.delay_min, self.delay_max))
+    
+    async def search_products(
+        self,
+        query: str,
+        category: str = None,
+        limit: int = 20
+    ) -> List[Product]:
+        """
+        Search for products on Amazon
+        
+        Args:
+            query: Search term
+            category: Product category
+            limit: Maximum products to scrape
             
-            # Create ratings
-            ratings = None
-            if rating > 0:
-                ratings = Ratings(
-                    average=rating,
-                    count=review_count
-                )
+        Returns:
+            List of Product objects
+        """
+        products = []
+        
+        print(f"🔍 Searching Amazon for: {query}")
+        
+        try:
+            search_url = self._build_search_url(query, category)
             
-            # Create source
-            source = ProductSource(
-                name="Amazon",
-                url=product_url,
-                price=current_price,
-                availability=availability,
-                last_checked=datetime.utcnow()
-            )
+            async with self.semaphore:
+                response = await self.client.get(search_url)
+                # Hold the slot through the delay so requests stay spaced out
+                await self._delay()
             
-            # Create product
-            product = Product(
-                id=product_id,
-                name=name,
-                slug=name.lower().replace(' ', '-')[:50],
-                category=category,
-                brand=None,  # Would need to extract from product page
-                current_price=current_price,
-                currency=Currency.USD,
-                availability=availability,
-                ratings=ratings,
-                images=[image_url] if image_url else [],
-                asin=asin,
-                sources=[source],
-                first_seen=datetime.utcnow(),
-                last_updated=datetime.utcnow(),
-                data_quality_score=40  # Low score for basic scraping
-            )
+            response.raise_for_status()
             
-            return product
+            # Parse off the event loop so other searches keep running
+            tree = await asyncio.to_thread(LexborHTMLParser, response.content)
+            products.extend(self._iter_products(tree, limit))
         
         except Exception as e:
-            print(f"Error parsing card: {e}")
-            return None
-    
-    def _determine_category(self, name: str) -> ProductCategory:
-        """Determine product category from name"""
-        name_lower = name.lower()
+            print(f"  ❌ Search failed: {e}")
         
-        # Simple keyword matching
-        if any(word in name_lower for word in ['laptop', 'computer', 'macbook', 'pc']):
-            return ProductCategory.COMPUTERS
-        elif any(word in name_lower for word in ['phone', 'iphone', 'android', 'samsung']):
-            return ProductCategory.SMARTPHONES
-        elif any(word in name_lower for word in ['book', 'novel', 'kindle']):
-            return ProductCategory.BOOKS
-        elif any(word in name_lower for word in ['clothes', 'shirt', 'pants', 'dress', 'fashion']):
-            return ProductCategory.FASHION
-        elif any(word in name_lower for word in ['toy', 'game', 'lego', 'doll']):
-            return ProductCategory.TOYS
-        elif any(word in name_lower for word in ['kitchen', 'home', 'furniture', 'decor']):
-            return ProductCategory.HOME
-        else:
-            return ProductCategory.ELECTRONICS
+        return products
 
 
 # CLI for testing
@@ -10,9 +10,10 @@ from datetime import datetime
 
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
-from src.scrapers.amazon_scraper import AmazonScraper
+from src.scrapers.amazon_scraper import AsyncAmazonScraper
 from src.utils.data_manager import DataManager
 from src.utils.sentiment_analyzer import analyze_product_reviews
+from src.utils.cache import invalidate_product_caches
 
 
 async def run_all_scrapers():
@@ -35,8 +36,6 @@ async def run_all_scrapers():
     # Run Amazon Scraper
     print("🔍 Running Amazon scraper...")
     try:
-        amazon_scraper = AmazonScraper(delay_min=3, delay_max=6)
-        
         # Search for different product categories
         search_terms = [
             "laptop",
@@ -46,11 +45,15 @@ async def run_all_scrapers():
             "camera"
         ]
         
-        for term in search_terms:
-            print(f"\n  Searching: {term}")
-            products = amazon_scraper.search_products(term, limit=10)
+        async with AsyncAmazonScraper(delay_min=3, delay_max=6) as amazon_scraper:
+            results = await asyncio.gather(*[
+                amazon_scraper.search_products(term, limit=10)
+                for term in search_terms
+            ])
+        
+        for term, products in zip(search_terms, results):
             all_products.extend(products)
-            print(f"  Found: {len(products)} products")
+            print(f"  {term}: {len(products)} products")
         
         print(f"\n✅ Amazon: Total {len(all_products)} products scraped")
     
@@ -64,11 +67,8 @@ async def run_all_scrapers():
         print("⚠️  No products scraped")
         return
     
-    # Remove duplicates
-    unique_products = {}
-    for product in all_products:
-        if product.id not in unique_products:
-            unique_products[product.id] = product
+    # Remove duplicates (last scraped record wins - freshest price)
+    unique_products = {product.id: product for product in all_products}
     
     unique_list = list(unique_products.values())
     print(f"✅ Unique products: {len(unique_list)}")
@@ -76,29 +76,12 @@ async def run_all_scrapers():
     # Update database
     print("\n💾 Updating database...")
     
-    new_added = 0
-    updated = 0
+    result = await data_manager.bulk_upsert(unique_list, source="Amazon")
+    new_added = result.added
+    updated = result.updated
     
-    for product in unique_list:
-        existing = await data_manager.get_by_id(product.id)
-        
-        if not existing:
-            await data_manager.add(product)
-            new_added += 1
-            print(f"  ➕ Added: {product.name[:50]}")
-        else:
-            # Update price history
-            if product.current_price != existing.current_price:
-                await data_manager.add_price_point(
-                    product.id,
-                    product.current_price,
-                    "Amazon"
-                )
-            
-            existing.last_updated = datetime.utcnow()
-            existing.availability = product.availability
-            await data_manager.update(existing)
-            updated += 1
+    # Cached API responses are now stale
+    await invalidate_product_caches()
     
     final_count = await data_manager.count()
     
@@ -0,0 +1,112 @@
+"""
+Response cache for E-commerce Product Data API
+Uses Redis when REDIS_URL is set, in-memory cache otherwise
+
+The in-memory cache is private to one process: the scraper can only
+invalidate the API's cached responses through Redis. Without it, stale
+responses live until their expiry (at most STATS_EXPIRE seconds)
+"""
+
+import hashlib
+import os
+from collections import OrderedDict
+from enum import Enum
+from typing import Callable, Optional
+
+from fastapi_cache import FastAPICache
+from fastapi_cache.backends.inmemory import InMemoryBackend, Value
+from fastapi_cache.backends.redis import RedisBackend
+from redis import asyncio as aioredis
+
+CACHE_PREFIX = "ecom"
+
+# Namespaces let the scraper invalidate related endpoints together
+SEARCH_NAMESPACE = "search"
+STATS_NAMESPACE = "stats"
+PRICE_HISTORY_NAMESPACE = "price-history"
+
+SEARCH_EXPIRE = 60
+STATS_EXPIRE = 300
+
+# Entry cap for the in-memory fallback (oldest entries are evicted first)
+IN_MEMORY_MAX_ENTRIES = 1024
+
+
+class BoundedInMemoryBackend(InMemoryBackend):
+    """In-memory backend that drops expired entries and caps its size"""
+    
+    def __init__(self, max_entries: int = IN_MEMORY_MAX_ENTRIES):
+        # Per instance - the base class shares one unbounded dict across instances
+        self._store = OrderedDict()
+        self.max_entries = max_entries
+    
+    async def set(self, key: str, value: str, expire: Optional[int] = None) -> None:
+        async with self._lock:
+            self._store.pop(key, None)
+            self._store[key] = Value(value, self._now + (expire or 0))
+            self._sweep()
+    
+    def _sweep(self):
+        now = self._now
+        expired = [key for key, value in self._store.items() if value.ttl_ts < now]
+        for key in expired:
+            del self._store[key]
+        
+        while len(self._store) > self.max_entries:
+            self._store.popitem(last=False)
+
+
+def query_key_builder(
+    func: Callable,
+    namespace: str = "",
+    *,
+    request=None,
+    response=None,
+    args: Optional[tuple] = None,
+    kwargs: Optional[dict] = None
+) -> str:
+    """
+    Build a cache key from the endpoint's query params
+
+    Omitted and explicit None params produce the same key
+    """
+    params = {
+        name: value.value if isinstance(value, Enum) else value
+        for name, value in sorted((kwargs or {}).items())
+        if value is not None
+    }
+    digest = hashlib.md5(
+        f"{func.__module__}:{func.__name__}:{params}".encode()
+    ).hexdigest()
+    return f"{FastAPICache.get_prefix()}:{namespace}:{digest}"
+
+
+def init_cache():
+    """Initialize the response cache backend (no-op if already initialized)"""
+    redis_url = os.getenv("REDIS_URL")
+
+    if redis_url:
+        backend = RedisBackend(aioredis.from_url(redis_url))
+    else:
+        backend = BoundedInMemoryBackend()
+
+    FastAPICache.init(backend, prefix=CACHE_PREFIX, key_builder=query_key_builder)
+
+
+async def invalidate_product_caches():
+    """
+    Drop cached responses that depend on product data
+    
+    Only reaches other processes (e.g. the API server) through Redis
+    """
+    if not os.getenv("REDIS_URL"):
+        print(
+            "⚠️  REDIS_URL not set - cannot invalidate the API's in-memory cache, "
+            f"cached responses expire within {STATS_EXPIRE}s"
+        )
+        return
+    
+    init_cache()
+
+    for namespace in (SEARCH_NAMESPACE, STATS_NAMESPACE, PRICE_HISTORY_NAMESPACE):
+        await FastAPICache.clear(namespace=namespace)
@@ -1,15 +1,83 @@
 """
 Data Manager for E-commerce Product Data API
 Handles JSON-based storage (free!) - upgradable to PostgreSQL
+
+Mutations are appended to a JSONL write-ahead log next to the snapshot;
+the log is folded back into the snapshot on close() or once it outgrows it
 """
 
+import heapq
 import json
+import mmap
 import os
-from datetime import datetime, timedelta
-from typing import List, Optional, Dict, Any
+from collections import Counter, OrderedDict
+from datetime import date, datetime, timedelta
+from typing import List, Optional, Dict, Any, Tuple, NamedTuple, Iterator
 from pathlib import Path
 
+import numpy as np
+from pydantic import TypeAdapter, ValidationError
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+
 from src.models.product import Product, ProductCategory, PricePoint
+from src.utils.product_index import ProductIndex, search_blob
+from src.utils.price_history import PriceSeries
+
+
+# Validates/serializes the whole snapshot in one call into pydantic-core
+PRODUCT_LIST_ADAPTER = TypeAdapter(List[Product])
+
+# Snapshots above this size are parsed incrementally (needs ijson) so the
+# whole JSON document never sits in memory next to the Product objects
+STREAM_LOAD_MIN_BYTES = 64 * 1024 * 1024
+
+# Recent search results (page IDs + total) kept between mutations
+SEARCH_CACHE_SIZE = 1024
+
+# Decoded price points kept for recently read products (~0.5 KB per point)
+HISTORY_CACHE_MAX_POINTS = 100_000
+
+SNAPSHOT_ERRORS = (json.JSONDecodeError, FileNotFoundError)
+if IJSON_AVAILABLE:
+    SNAPSHOT_ERRORS += (ijson.JSONError,)
+
+
+def _json_default(obj: Any) -> str:
+    """Stdlib json fallback for the non-JSON types log records can carry"""
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _dumps(obj: Any) -> bytes:
+    """Serialize to compact JSON bytes (orjson when installed)"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj)  # datetimes are handled natively
+    return json.dumps(obj, separators=(',', ':'), default=_json_default).encode()
+
+
+def _loads(data: bytes) -> Any:
+    """Parse JSON bytes (orjson when installed)"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class UpsertResult(NamedTuple):
+    """Outcome of DataManager.bulk_upsert"""
+    added: int
+    updated: int
 
 
 class DataManager:
@@ -20,7 +88,20 @@ class DataManager:
             data_file = os.getenv("JSON_DATA_PATH", "src/data/products.json")
         
         self.data_file = Path(data_file)
+        self.wal_file = self.data_file.with_suffix(".wal.jsonl")
+        self.fsync = os.getenv("WAL_FSYNC", "false").lower() == "true"
+        # Stored products keep an empty price_history; the history itself is
+        # kept compressed in price_histories and attached on the way out
         self.products: Dict[str, Product] = {}
+        self.price_histories: Dict[str, PriceSeries] = {}
+        # Lowercased search text per product, computed once per write
+        self._search_blobs: Dict[str, str] = {}
+        self._index: Optional[ProductIndex] = None
+        # (filters, limit, offset) -> (page IDs or None for counts, total)
+        self._search_cache: "OrderedDict[tuple, Tuple[Optional[List[str]], int]]" = OrderedDict()
+        # product ID -> decoded price history, for recently read products
+        self._history_cache: "OrderedDict[str, List[PricePoint]]" = OrderedDict()
+        self._history_cache_points = 0
         self._ensure_data_dir()
     
     def _ensure_data_dir(self):
@@ -33,31 +114,101 @@ class DataManager:
     
     async def initialize(self):
         """Load data from JSON file"""
+        self._history_cache.clear()
+        self._history_cache_points = 0
+        
         try:
-            with open(self.data_file, 'r') as f:
-                data = json.load(f)
+            if IJSON_AVAILABLE and self.data_file.stat().st_size > STREAM_LOAD_MIN_BYTES:
+                products = self._stream_products()
+            else:
+                products = self._validate_products(self._load_snapshot())
             
             self.products = {}
-            for item in data:
-                try:
-                    product = Product(**item)
-                    self.products[product.id] = product
-                except Exception as e:
-                    print(f"Warning: Failed to load product: {e}")
-                    continue
+            self.price_histories = {}
+            self._search_blobs = {}
+            for product in products:
+                self._store(product)
             
             print(f"✅ Loaded {len(self.products)} products from {self.data_file}")
         
-        except (json.JSONDecodeError, FileNotFoundError):
+        except SNAPSHOT_ERRORS:
             print(f"⚠️  Starting with empty dataset")
             self.products = {}
+            self.price_histories = {}
+            self._search_blobs = {}
+        
+        replayed = self._replay_log()
+        if replayed:
+            print(f"✅ Replayed {replayed} logged changes from {self.wal_file}")
+        
+        self._invalidate_index()
+    
+    @staticmethod
+    def _validate_products(data: Any) -> List[Product]:
+        """Validate snapshot records, skipping (and reporting) any invalid ones"""
+        try:
+            return PRODUCT_LIST_ADAPTER.validate_python(data)
+        except ValidationError:
+            pass
+        
+        # Slow path: find the bad records without dropping the good ones
+        products = []
+        for item in data:
+            try:
+                products.append(Product(**item))
+            except Exception as e:
+                print(f"Warning: Failed to load product: {e}")
+                continue
+        return products
+    
+    def _stream_products(self) -> Iterator[Product]:
+        """Parse and validate snapshot records one at a time (ijson)"""
+        # ijson picks its fastest installed backend (yajl2_c when compiled)
+        with open(self.data_file, 'rb') as f:
+            for item in ijson.items(f, 'item', use_float=True):
+                try:
+                    yield Product(**item)
+                except Exception as e:
+                    print(f"Warning: Failed to load product: {e}")
+                    continue
+    
+    def _load_snapshot(self) -> Any:
+        """Parse the snapshot file, memory-mapped when orjson can read it in place"""
+        with open(self.data_file, 'rb') as f:
+            if not ORJSON_AVAILABLE or os.fstat(f.fileno()).st_size == 0:
+                return _loads(f.read())
+            
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if hasattr(mmap, "MADV_SEQUENTIAL"):
+                    mm.madvise(mmap.MADV_SEQUENTIAL)  # single linear scan
+                with memoryview(mm) as view:
+                    return orjson.loads(view)
     
     async def save(self):
-        """Save data to JSON file"""
-        data = [product.model_dump(mode='json') for product in self.products.values()]
+        """Write a full snapshot to the JSON file and truncate the log"""
+        # Decoded directly - a full pass would only flush the history cache
+        data = [self._with_history(product, cache=False) for product in self.products.values()]
+        
+        # Write aside, make it durable, then swap in - a crash leaves either
+        # the old or the new snapshot, never a partial one
+        tmp_file = self.data_file.with_suffix(".json.tmp")
+        with open(tmp_file, 'wb') as f:
+            f.write(PRODUCT_LIST_ADAPTER.dump_json(data))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, self.data_file)
         
-        with open(self.data_file, 'w') as f:
-            json.dump(data, f, indent=2, default=str)
+        # Persist the rename itself (POSIX only - Windows can't open directories)
+        if hasattr(os, "O_DIRECTORY"):
+            dir_fd = os.open(self.data_file.parent, os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.fsync(dir_fd)
+            finally:
+                os.close(dir_fd)
+        
+        # Everything in the log is now in the snapshot (replaying it again
+        # after a crash right here is harmless - see _apply)
+        open(self.wal_file, 'wb').close()
         
         print(f"💾 Saved {len(data)} products")
     
@@ -65,32 +216,189 @@ class DataManager:
         """Save and cleanup"""
         await self.save()
     
+    # Write-ahead log
+    
+    async def _log(self, records: List[Dict[str, Any]]):
+        """Append change records to the log, compacting once it outgrows the snapshot"""
+        payload = b"".join(_dumps(record) + b"\n" for record in records)
+        
+        fd = os.open(self.wal_file, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            view = memoryview(payload)
+            while view:
+                view = view[os.write(fd, view):]
+            if self.fsync:
+                os.fsync(fd)
+        finally:
+            os.close(fd)
+        
+        if self.wal_file.stat().st_size > self.data_file.stat().st_size:
+            await self.save()
+    
+    @staticmethod
+    def _upsert_record(product: Product) -> Dict[str, Any]:
+        return {"op": "upsert", "product": product.model_dump(mode='json')}
+    
+    def _replay_log(self) -> int:
+        """Apply logged changes on top of the loaded snapshot"""
+        if not self.wal_file.exists():
+            return 0
+        
+        replayed = 0
+        valid_end = 0  # byte offset just past the last complete record
+        torn = False
+        with open(self.wal_file, 'rb') as f:
+            for line in f:
+                try:
+                    if not line.endswith(b"\n"):
+                        raise json.JSONDecodeError("missing newline", "", len(line))
+                    record = _loads(line)
+                except json.JSONDecodeError:
+                    # Torn final write from a crash - nothing after it is valid
+                    print(f"Warning: Ignoring incomplete log record in {self.wal_file}")
+                    torn = True
+                    break
+                valid_end += len(line)
+                
+                try:
+                    self._apply(record)
+                except Exception as e:
+                    print(f"Warning: Failed to replay {record.get('op')} record: {e}")
+                    continue
+                replayed += 1
+        
+        if torn:
+            # Cut the partial record off so later appends start on a fresh line
+            os.truncate(self.wal_file, valid_end)
+        
+        return replayed
+    
+    def _apply(self, record: Dict[str, Any]):
+        """Apply one log record to in-memory state (idempotent, so replay can repeat)"""
+        op = record["op"]
+        
+        if op == "upsert":
+            self._store(Product(**record["product"]))
+        elif op == "delete":
+            self.products.pop(record["id"], None)
+            self.price_histories.pop(record["id"], None)
+            self._search_blobs.pop(record["id"], None)
+            self._drop_cached_history(record["id"])
+        elif op == "price":
+            product = self.products.get(record["id"])
+            if product is not None:
+                price_point = PricePoint(**record["point"])
+                series = self.price_histories.get(product.id)
+                if series is None or price_point not in series:
+                    self._append_price(product.id, price_point)
+                product.last_updated = datetime.fromisoformat(record["last_updated"])
+        else:
+            raise ValueError(f"unknown op {op!r}")
+    
     # CRUD Operations
     
+    def _store(self, product: Product):
+        """Store product, moving its price history into compressed storage"""
+        if product.price_history:
+            self.price_histories[product.id] = PriceSeries(product.price_history)
+            product = product.model_copy(update={"price_history": []})
+        else:
+            self.price_histories.pop(product.id, None)
+        
+        self.products[product.id] = product
+        self._search_blobs[product.id] = search_blob(product)
+        self._drop_cached_history(product.id)
+    
+    def _append_price(self, product_id: str, price_point: PricePoint):
+        """Append to a product's compressed history"""
+        self.price_histories.setdefault(product_id, PriceSeries()).append(price_point)
+        self._drop_cached_history(product_id)
+    
+    def _with_history(self, product: Product, cache: bool = True) -> Product:
+        """Return product with its decompressed price history attached"""
+        series = self.price_histories.get(product.id)
+        if series is None:
+            return product
+        
+        points = self._history_cache.get(product.id) if cache else None
+        if points is not None:
+            self._history_cache.move_to_end(product.id)
+        else:
+            points = series.points()
+            if cache:
+                self._cache_history(product.id, points)
+        
+        # Callers get their own list; the cached one is never handed out
+        return product.model_copy(update={"price_history": list(points)})
+    
+    def _cache_history(self, product_id: str, points: List[PricePoint]):
+        """Cache decoded points, evicting the least recently read beyond the point budget"""
+        if len(points) > HISTORY_CACHE_MAX_POINTS:
+            return
+        
+        self._history_cache[product_id] = points
+        self._history_cache_points += len(points)
+        while self._history_cache_points > HISTORY_CACHE_MAX_POINTS:
+            _, evicted = self._history_cache.popitem(last=False)
+            self._history_cache_points -= len(evicted)
+    
+    def _drop_cached_history(self, product_id: str):
+        evicted = self._history_cache.pop(product_id, None)
+        if evicted is not None:
+            self._history_cache_points -= len(evicted)
+    
     async def add(self, product: Product) -> Product:
         """Add a new product"""
-        self.products[product.id] = product
-        await self.save()
+        self._store(product)
+        self._invalidate_index()
+        await self._log([self._upsert_record(product)])
         return product
     
     async def update(self, product: Product) -> Product:
-        """Update an existing product"""
+        """Update an existing product (its price_history replaces the stored one)"""
         product.last_updated = datetime.utcnow()
-        self.products[product.id] = product
-        await self.save()
+        self._store(product)
+        self._invalidate_index()
+        await self._log([self._upsert_record(product)])
         return product
     
     async def delete(self, product_id: str) -> bool:
         """Delete a product"""
         if product_id in self.products:
             del self.products[product_id]
-            await self.save()
+            self.price_histories.pop(product_id, None)
+            del self._search_blobs[product_id]
+            self._drop_cached_history(product_id)
+            self._invalidate_index()
+            await self._log([{"op": "delete", "id": product_id}])
             return True
         return False
     
-    async def get_by_id(self, product_id: str) -> Optional[Product]:
-        """Get product by ID"""
-        return self.products.get(product_id)
+    async def get_by_id(
+        self,
+        product_id: str,
+        include_history: bool = True
+    ) -> Optional[Product]:
+        """
+        Get product by ID
+        
+        Args:
+            product_id: Product ID
+            include_history: Decompress and attach the full price history
+                (pass False when only product fields are needed)
+        """
+        product = self.products.get(product_id)
+        if product is None or not include_history:
+            return product
+        return self._with_history(product)
+    
+    async def get_many(self, product_ids: List[str]) -> Dict[str, Product]:
+        """Get several products by ID in one lookup (missing IDs are skipped)"""
+        return {
+            pid: self._with_history(self.products[pid])
+            for pid in product_ids
+            if pid in self.products
+        }
     
     async def count(self) -> int:
         """Get total number of products"""
@@ -105,66 +413,81 @@ class DataManager:
         offset: int = 0
     ) -> List[Product]:
         """Search products with filters"""
-        results = list(self.products.values())
-        
-        # Apply filters
-        if "q" in filters and filters["q"]:
-            query = filters["q"].lower()
-            results = [
-                p for p in results
-                if query in p.name.lower()
-                or (p.description and query in p.description.lower())
-                or (p.brand and query in p.brand.lower())
-                or any(query in tag.lower() for tag in p.tags)
-            ]
-        
-        if "category" in filters:
-            category = filters["category"]
-            results = [p for p in results if p.category == category]
-        
-        if "brand" in filters and filters["brand"]:
-            brand = filters["brand"].lower()
-            results = [p for p in results if p.brand and brand in p.brand.lower()]
-        
-        if "min_price" in filters and filters["min_price"] is not None:
-            min_price = filters["min_price"]
-            results = [p for p in results if p.current_price >= min_price]
-        
-        if "max_price" in filters and filters["max_price"] is not None:
-            max_price = filters["max_price"]
-            results = [p for p in results if p.current_price <= max_price]
-        
-        if "min_rating" in filters and filters["min_rating"] is not None:
-            min_rating = filters["min_rating"]
-            results = [
-                p for p in results
-                if p.ratings and p.ratings.average >= min_rating
-            ]
-        
-        if "in_stock_only" in filters and filters["in_stock_only"]:
-            results = [p for p in results if p.availability.in_stock]
-        
-        # Sort
-        sort_by = filters.get("sort_by", "relevance")
-        if sort_by == "price_asc":
-            results.sort(key=lambda p: p.current_price)
-        elif sort_by == "price_desc":
-            results.sort(key=lambda p: p.current_price, reverse=True)
-        elif sort_by == "rating":
-            results.sort(
-                key=lambda p: p.ratings.average if p.ratings else 0,
-                reverse=True
-            )
-        elif sort_by == "newest":
-            results.sort(key=lambda p: p.first_seen, reverse=True)
+        results, _ = await self.search_with_count(filters, limit=limit, offset=offset)
+        return results
+    
+    async def search_with_count(
+        self,
+        filters: Dict[str, Any],
+        limit: int = 10,
+        offset: int = 0
+    ) -> Tuple[List[Product], int]:
+        """Search products with filters, returning one page and the total match count"""
+        key = self._search_key(filters, limit, offset)
+        cached = self._cache_get(key)
         
-        # Pagination
-        return results[offset:offset + limit]
+        if cached is None:
+            index = self._get_index()
+            rows = self._filter_rows(filters)
+            total = len(rows)
+            rows = index.sort_rows(rows, filters.get("sort_by", "relevance"), limit=offset + limit)
+            
+            # Pagination - only the requested page is materialized
+            page_ids = [p.id for p in index.materialize(rows[offset:offset + limit])]
+            cached = self._cache_put(key, (page_ids, total))
+        
+        page_ids, total = cached
+        return [self._with_history(self.products[pid]) for pid in page_ids], total
     
     async def count_filtered(self, filters: Dict[str, Any]) -> int:
-        """Count products matching filters"""
-        results = await self.search(filters, limit=999999, offset=0)
-        return len(results)
+        """Count products matching filters (no sorting or Product lookups)"""
+        key = self._search_key(filters, None, None)
+        cached = self._cache_get(key)
+        
+        if cached is None:
+            cached = self._cache_put(key, (None, len(self._filter_rows(filters))))
+        return cached[1]
+    
+    @staticmethod
+    def _search_key(filters: Dict[str, Any], limit: Optional[int], offset: Optional[int]) -> tuple:
+        return (tuple(sorted(filters.items())), limit, offset)
+    
+    def _cache_get(self, key: tuple) -> Optional[Tuple[Optional[List[str]], int]]:
+        """Look up a cached search result, marking it recently used"""
+        cached = self._search_cache.get(key)
+        if cached is not None:
+            self._search_cache.move_to_end(key)
+        return cached
+    
+    def _cache_put(
+        self,
+        key: tuple,
+        value: Tuple[Optional[List[str]], int]
+    ) -> Tuple[Optional[List[str]], int]:
+        """Cache a search result, evicting the least recently used beyond the limit"""
+        self._search_cache[key] = value
+        if len(self._search_cache) > SEARCH_CACHE_SIZE:
+            self._search_cache.popitem(last=False)
+        return value
+    
+    def _filter_rows(self, filters: Dict[str, Any]) -> np.ndarray:
+        """Index rows matching filters - shared by search and count"""
+        return self._get_index().filter_rows(filters)
+    
+    def _get_index(self) -> ProductIndex:
+        """Get the columnar search index, rebuilding it after mutations"""
+        if self._index is None:
+            products = list(self.products.values())
+            self._index = ProductIndex(
+                products,
+                [self._search_blobs[p.id] for p in products]
+            )
+        return self._index
+    
+    def _invalidate_index(self):
+        """Mark the search index and cached search results stale"""
+        self._index = None
+        self._search_cache.clear()
     
     async def get_by_category(
         self,
@@ -172,18 +495,19 @@ class DataManager:
         limit: int = 20
     ) -> List[Product]:
         """Get products by category"""
-        results = [p for p in self.products.values() if p.category == category]
-        results.sort(
-            key=lambda p: p.ratings.average if p.ratings else 0,
-            reverse=True
+        # Same order as a stable descending sort, without sorting the whole category
+        results = heapq.nlargest(
+            limit,
+            (p for p in self.products.values() if p.category == category),
+            key=lambda p: p.ratings.average if p.ratings else 0
         )
-        return results[:limit]
+        return [self._with_history(p) for p in results]
     
     # Price Tracking
     
     async def add_price_point(self, product_id: str, price: float, source: str):
         """Add a price point to product history"""
-        product = await self.get_by_id(product_id)
+        product = self.products.get(product_id)
         if not product:
             return None
         
@@ -194,11 +518,16 @@ class DataManager:
             source=source
         )
         
-        product.price_history.append(price_point)
+        self._append_price(product_id, price_point)
         product.last_updated = datetime.utcnow()
         
-        await self.update(product)
-        return product
+        await self._log([{
+            "op": "price",
+            "id": product_id,
+            "point": price_point.model_dump(mode='json'),
+            "last_updated": product.last_updated.isoformat()
+        }])
+        return self._with_history(product)
     
     async def get_price_history(
         self,
@@ -206,56 +535,105 @@ class DataManager:
         days: int = 30
     ) -> List[PricePoint]:
         """Get price history for a product"""
-        product = await self.get_by_id(product_id)
-        if not product:
+        series = self.price_histories.get(product_id)
+        if series is None:
             return []
         
+        # Only this product's history is decompressed
         cutoff_date = datetime.utcnow() - timedelta(days=days)
-        return [
-            pp for pp in product.price_history
-            if pp.date >= cutoff_date
-        ]
+        return series.points(since=cutoff_date)
     
     # Bulk Operations
     
     async def add_many(self, products: List[Product]) -> int:
-        """Add multiple products"""
+        """Add multiple products (existing IDs are skipped; within the batch the last duplicate wins)"""
+        new = {p.id: p for p in products if p.id not in self.products}
+        if not new:
+            return 0
+        
+        for product in new.values():
+            self._store(product)
+        
+        self._invalidate_index()
+        await self._log([
+            {"op": "upsert", "product": product}
+            for product in PRODUCT_LIST_ADAPTER.dump_python(list(new.values()), mode='json')
+        ])
+        return len(new)
+    
+    async def bulk_upsert(self, products: List[Product], source: str) -> UpsertResult:
+        """
+        Add new products and refresh existing ones in one pass
+        
+        Existing products get the new availability, and a price point
+        when the price changed. The whole batch is logged in one write.
+        
+        Args:
+            products: Freshly scraped products
+            source: Price point source name (e.g. "Amazon")
+            
+        Returns:
+            UpsertResult with added/updated counts
+        """
         added = 0
+        updated = 0
+        now = datetime.utcnow()
+        records = []
+        
         for product in products:
-            if product.id not in self.products:
-                self.products[product.id] = product
+            existing = self.products.get(product.id)
+            
+            if existing is None:
+                self._store(product)
+                records.append(self._upsert_record(product))
                 added += 1
+                continue
+            
+            if product.current_price != existing.current_price:
+                price_point = PricePoint(
+                    date=now,
+                    price=product.current_price,
+                    currency=existing.currency,
+                    source=source
+                )
+                self._append_price(product.id, price_point)
+            
+            existing.availability = product.availability
+            existing.last_updated = now
+            records.append(self._upsert_record(self._with_history(existing)))
+            updated += 1
         
-        await self.save()
-        return added
+        self._invalidate_index()
+        await self._log(records)
+        return UpsertResult(added=added, updated=updated)
     
     async def get_all(self) -> List[Product]:
         """Get all products"""
-        return list(self.products.values())
+        return [self._with_history(p) for p in self.products.values()]
     
     # Analytics
     
     async def get_category_distribution(self) -> Dict[str, int]:
         """Get count of products per category"""
-        distribution = {}
-        
-        for product in self.products.values():
-            cat_name = product.category.value if hasattr(product.category, 'value') else str(product.category)
-            distribution[cat_name] = distribution.get(cat_name, 0) + 1
+        distribution = Counter(
+            product.category.value if hasattr(product.category, 'value') else str(product.category)
+            for product in self.products.values()
+        )
         
-        return dict(sorted(distribution.items(), key=lambda x: x[1], reverse=True))
+        return dict(distribution.most_common())
     
     async def get_price_stats(self) -> Dict[str, float]:
         """Get price statistics"""
         if not self.products:
             return {"min": 0, "max": 0, "average": 0, "median": 0}
         
-        prices = [p.current_price for p in self.products.values()]
-        prices.sort()
+        # Reuse the index's price column; selection instead of a full sort
+        prices = self._get_index().prices
+        middle = len(prices) // 2
         
         return {
-            "min": min(prices),
-            "max": max(prices),
-            "average": sum(prices) / len(prices),
-            "median": prices[len(prices) // 2]
+            "min": float(prices.min()),
+            "max": float(prices.max()),
+            "average": float(prices.mean()),
+            "median": float(np.partition(prices, middle)[middle])  # upper median
         }
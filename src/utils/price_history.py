@@ -0,0 +1,311 @@
+"""
+Compressed price history storage
+Gorilla-style encoding: delta-of-delta timestamps and XOR'd float prices,
+partitioned into one block per month
+"""
+
+import bisect
+import struct
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, List, Optional, Iterable, Tuple
+
+from src.models.product import PricePoint, Currency
+
+
+EPOCH = datetime(1970, 1, 1)
+ONE_MICROSECOND = timedelta(microseconds=1)
+
+# (prefix, prefix bits, value bits) for delta-of-delta timestamps
+DOD_BUCKETS = [
+    (0b10, 2, 7),
+    (0b110, 3, 9),
+    (0b1110, 4, 12),
+    (0b11110, 5, 32),
+]
+DOD_FALLBACK = (0b11111, 5, 64)
+
+LABEL_BITS = 16
+
+
+def _to_naive_utc(dt: datetime) -> datetime:
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt
+
+
+def _block_key(dt: datetime) -> date:
+    """First day of the (UTC) month a timestamp falls in"""
+    return _to_naive_utc(dt).date().replace(day=1)
+
+
+def _to_micros(dt: datetime) -> int:
+    """Naive-UTC datetime -> microseconds since epoch"""
+    return (_to_naive_utc(dt) - EPOCH) // ONE_MICROSECOND
+
+
+def _from_micros(micros: int) -> datetime:
+    return EPOCH + micros * ONE_MICROSECOND
+
+
+def _float_to_bits(value: float) -> int:
+    return struct.unpack('>Q', struct.pack('>d', value))[0]
+
+
+def _bits_to_float(bits: int) -> float:
+    return struct.unpack('>d', struct.pack('>Q', bits))[0]
+
+
+class _BitWriter:
+    """Append-only big-endian bit buffer"""
+
+    def __init__(self):
+        self.buffer = bytearray()
+        self._acc = 0
+        self._nbits = 0
+
+    def write(self, value: int, nbits: int):
+        self._acc = (self._acc << nbits) | (value & ((1 << nbits) - 1))
+        self._nbits += nbits
+        while self._nbits >= 8:
+            self._nbits -= 8
+            self.buffer.append((self._acc >> self._nbits) & 0xFF)
+        self._acc &= (1 << self._nbits) - 1
+
+    def getvalue(self) -> bytes:
+        if self._nbits:
+            return bytes(self.buffer) + bytes([(self._acc << (8 - self._nbits)) & 0xFF])
+        return bytes(self.buffer)
+
+
+class _BitReader:
+    """Sequential reader over a _BitWriter buffer"""
+
+    def __init__(self, data: bytes):
+        self._data = data
+        self._pos = 0
+
+    def read(self, nbits: int) -> int:
+        start = self._pos >> 3
+        end = (self._pos + nbits + 7) >> 3
+        chunk = int.from_bytes(self._data[start:end], 'big')
+        shift = (end - start) * 8 - (self._pos & 7) - nbits
+        self._pos += nbits
+        return (chunk >> shift) & ((1 << nbits) - 1)
+
+    def read_signed(self, nbits: int) -> int:
+        value = self.read(nbits)
+        if value >= 1 << (nbits - 1):
+            value -= 1 << nbits
+        return value
+
+
+def encode_points(
+    points: List[PricePoint],
+    labels: List[Tuple[Currency, str]]
+) -> bytes:
+    """
+    Encode price points into a compressed bit stream
+
+    Args:
+        points: Price points in storage order
+        labels: Shared (currency, source) table; new labels are appended
+
+    Returns:
+        Encoded bytes
+    """
+    writer = _BitWriter()
+    label_codes = {label: code for code, label in enumerate(labels)}
+
+    prev_ts = prev_delta = prev_bits = prev_label = 0
+    prev_leading = prev_trailing = None
+
+    for i, point in enumerate(points):
+        ts = _to_micros(point.date)
+        bits = _float_to_bits(point.price)
+        label = (Currency(point.currency), point.source)
+        if label not in label_codes:
+            label_codes[label] = len(labels)
+            labels.append(label)
+        label_code = label_codes[label]
+
+        if i == 0:
+            writer.write(ts + (1 << 63), 64)
+            writer.write(bits, 64)
+            writer.write(label_code, LABEL_BITS)
+        else:
+            # Timestamp: delta-of-delta
+            delta = ts - prev_ts
+            dod = delta - prev_delta
+            if dod == 0:
+                writer.write(0, 1)
+            else:
+                for prefix, prefix_bits, value_bits in DOD_BUCKETS:
+                    if -(1 << (value_bits - 1)) <= dod < 1 << (value_bits - 1):
+                        break
+                else:
+                    prefix, prefix_bits, value_bits = DOD_FALLBACK
+                writer.write(prefix, prefix_bits)
+                writer.write(dod, value_bits)
+            prev_delta = delta
+
+            # Price: XOR with previous value
+            xor = bits ^ prev_bits
+            if xor == 0:
+                writer.write(0, 1)
+            else:
+                leading = min(64 - xor.bit_length(), 31)
+                trailing = (xor & -xor).bit_length() - 1
+                if (
+                    prev_leading is not None
+                    and leading >= prev_leading
+                    and trailing >= prev_trailing
+                ):
+                    writer.write(0b10, 2)
+                    writer.write(xor >> prev_trailing, 64 - prev_leading - prev_trailing)
+                else:
+                    meaningful = 64 - leading - trailing
+                    writer.write(0b11, 2)
+                    writer.write(leading, 5)
+                    writer.write(meaningful & 63, 6)  # 64 is stored as 0
+                    writer.write(xor >> trailing, meaningful)
+                    prev_leading, prev_trailing = leading, trailing
+
+            # Currency/source: usually unchanged
+            if label_code == prev_label:
+                writer.write(0, 1)
+            else:
+                writer.write(1, 1)
+                writer.write(label_code, LABEL_BITS)
+
+        prev_ts, prev_bits, prev_label = ts, bits, label_code
+
+    return writer.getvalue()
+
+
+def decode_points(
+    data: bytes,
+    count: int,
+    labels: List[Tuple[Currency, str]]
+) -> List[PricePoint]:
+    """Decode `count` price points produced by encode_points"""
+    reader = _BitReader(data)
+    points = []
+
+    prev_ts = prev_delta = prev_bits = prev_label = 0
+    prev_leading = prev_trailing = 0
+
+    for i in range(count):
+        if i == 0:
+            ts = reader.read(64) - (1 << 63)
+            bits = reader.read(64)
+            label_code = reader.read(LABEL_BITS)
+        else:
+            if reader.read(1) == 0:
+                dod = 0
+            else:
+                for _, prefix_bits, value_bits in DOD_BUCKETS:
+                    if reader.read(1) == 0:
+                        break
+                else:
+                    value_bits = DOD_FALLBACK[2]
+                dod = reader.read_signed(value_bits)
+            prev_delta += dod
+            ts = prev_ts + prev_delta
+
+            if reader.read(1) == 0:
+                bits = prev_bits
+            else:
+                if reader.read(1) == 1:
+                    prev_leading = reader.read(5)
+                    meaningful = reader.read(6) or 64
+                    prev_trailing = 64 - prev_leading - meaningful
+                meaningful = 64 - prev_leading - prev_trailing
+                bits = prev_bits ^ (reader.read(meaningful) << prev_trailing)
+
+            label_code = reader.read(LABEL_BITS) if reader.read(1) else prev_label
+
+        currency, source = labels[label_code]
+        points.append(PricePoint.model_construct(
+            date=_from_micros(ts),
+            price=_bits_to_float(bits),
+            currency=currency,
+            source=source
+        ))
+        prev_ts, prev_bits, prev_label = ts, bits, label_code
+
+    return points
+
+
+class PriceSeries:
+    """
+    Compressed price history for one product
+
+    Points are bucketed by (UTC) month; each month is an independently
+    encoded block, so range queries skip whole months without decoding them.
+    Months rather than days keep enough points per block for the encoding
+    to pay off on one-point-per-day series (the block header alone is 18 bytes)
+    """
+
+    __slots__ = ("_blocks", "_months", "_labels")
+
+    def __init__(self, points: Iterable[PricePoint] = ()):
+        self._labels: List[Tuple[Currency, str]] = []
+        self._blocks: Dict[date, Tuple[bytes, int]] = {}
+        self._months: List[date] = []  # sorted block keys
+
+        by_month: Dict[date, List[PricePoint]] = {}
+        for point in points:
+            by_month.setdefault(_block_key(point.date), []).append(point)
+
+        for month, month_points in by_month.items():
+            self._set_block(month, month_points)
+
+    def __len__(self) -> int:
+        return sum(count for _, count in self._blocks.values())
+
+    def _set_block(self, month: date, points: List[PricePoint]):
+        if month not in self._blocks:
+            bisect.insort(self._months, month)
+        self._blocks[month] = (encode_points(points, self._labels), len(points))
+
+    def _block_points(self, month: date) -> List[PricePoint]:
+        data, count = self._blocks[month]
+        return decode_points(data, count, self._labels)
+
+    def __contains__(self, point: PricePoint) -> bool:
+        """Check for an identical point (only its month's block is decoded)"""
+        month = _block_key(point.date)
+        if month not in self._blocks:
+            return False
+
+        key = (_to_naive_utc(point.date), point.price, Currency(point.currency), point.source)
+        return any(
+            (pp.date, pp.price, pp.currency, pp.source) == key
+            for pp in self._block_points(month)
+        )
+
+    def append(self, point: PricePoint):
+        """Add a price point (only its month's block is re-encoded)"""
+        month = _block_key(point.date)
+        points = self._block_points(month) if month in self._blocks else []
+        points.append(point)
+        self._set_block(month, points)
+
+    def points(self, since: Optional[datetime] = None) -> List[PricePoint]:
+        """Decode price points month by month, optionally only those dated on/after `since`"""
+        if since is None:
+            return [point for month in self._months for point in self._block_points(month)]
+
+        since_month = _block_key(since)
+        since = _to_naive_utc(since)
+        points = []
+        # Blocks before the cutoff month are never visited
+        start = bisect.bisect_left(self._months, since_month)
+        for month in self._months[start:]:
+            block = self._block_points(month)
+            if month == since_month:
+                # Points within a month keep insertion order, so filter, don't bisect
+                block = [pp for pp in block if pp.date >= since]
+            points.extend(block)
+
+        return points
@@ -0,0 +1,408 @@
+"""
+Columnar product index for DataManager search
+Keeps filterable fields as NumPy arrays so filters run as vectorized masks,
+plus postings (sorted row numbers per category/brand/trigram) and a price
+order so selective filters only touch matching rows
+"""
+
+from typing import List, Dict, Any, Optional, Tuple, Callable, NamedTuple
+
+from functools import reduce
+
+import numpy as np
+
+try:
+    import numexpr as ne
+    NUMEXPR_AVAILABLE = True
+except ImportError:
+    NUMEXPR_AVAILABLE = False
+
+from src.models.product import Product, ProductCategory
+
+
+CATEGORY_CODES = {category: code for code, category in enumerate(ProductCategory)}
+
+# numexpr only pays off on large columns with more than one thread to use;
+# below this the NumPy path is faster
+NUMEXPR_MIN_ROWS = 100_000
+
+COMPARISONS = {"==": np.equal, ">=": np.greater_equal, "<=": np.less_equal}
+
+# (column, comparison, value); comparison None means column is already a mask,
+# "in" means value is a boolean table indexed by the column's codes
+Predicate = Tuple[np.ndarray, Optional[str], Any]
+
+
+class Clause(NamedTuple):
+    """One filter: matching-row count, optional postings builder, predicate form"""
+    size: int
+    posting: Optional[Callable[[], np.ndarray]]
+    predicates: List[Predicate]
+
+
+# Price ranges narrower than this share of the catalog are read from the
+# price order; wider ones are cheaper as a vectorized comparison
+PRICE_POSTING_MAX_SHARE = 0.125
+
+TRIGRAM = 3
+
+# Large catalogs keep a full stable sort order per sort key; a query that
+# matches a dense share of rows reads its ordering off that instead of sorting
+SORT_PERMUTATION_MIN_ROWS = 10_000
+SORT_PERMUTATION_MIN_SHARE = 1 / 16
+
+# sort_by -> (column attribute, descending)
+SORT_COLUMNS = {
+    "price_asc": ("prices", False),
+    "price_desc": ("prices", True),
+    "rating": ("ratings", True),
+    "newest": ("first_seen", True),
+}
+
+NO_ROWS = np.empty(0, dtype=np.intp)
+
+
+# Joins text fields in a search blob; queries never contain it, so a match
+# cannot span two fields
+BLOB_SEPARATOR = "\x00"
+
+
+def search_blob(product: Product) -> str:
+    """Lowercased text fields searched by the q filter, as one string"""
+    fields = [product.name, product.description, product.brand, *product.tags]
+    return BLOB_SEPARATOR.join(field.lower() for field in fields if field)
+
+
+def _matches_query(product: Product, query: str) -> bool:
+    """Check if lowercased query appears in product text fields"""
+    return (
+        query in product.name.lower()
+        or bool(product.description and query in product.description.lower())
+        or bool(product.brand and query in product.brand.lower())
+        or any(query in tag.lower() for tag in product.tags)
+    )
+
+
+def _trigrams(text: str) -> set:
+    return {text[i:i + TRIGRAM] for i in range(len(text) - TRIGRAM + 1)}
+
+
+def _group_rows(codes: np.ndarray) -> Dict[int, np.ndarray]:
+    """Postings: code -> sorted row numbers having that code"""
+    order = np.argsort(codes, kind="stable")
+    values, starts = np.unique(codes[order], return_index=True)
+    return dict(zip(values.tolist(), np.split(order, starts[1:])))
+
+
+class ProductIndex:
+    """Column arrays (one row per product, insertion order) for search"""
+
+    def __init__(self, products: List[Product], search_blobs: Optional[List[str]] = None):
+        n = len(products)
+
+        self.products = products
+        self.search_blobs = (
+            search_blobs if search_blobs is not None
+            else [search_blob(p) for p in products]
+        )
+        self.prices = np.fromiter(
+            (p.current_price for p in products), dtype=np.float64, count=n
+        )
+        self.ratings = np.fromiter(
+            (p.ratings.average if p.ratings else 0 for p in products),
+            dtype=np.float64,
+            count=n
+        )
+        self.has_ratings = np.fromiter(
+            (p.ratings is not None for p in products), dtype=np.bool_, count=n
+        )
+        self.category_codes = np.fromiter(
+            (CATEGORY_CODES[p.category] for p in products), dtype=np.int8, count=n
+        )
+        self.brands, self.brand_codes = self._encode_brands(products)
+        self.in_stock = np.fromiter(
+            (p.availability.in_stock for p in products), dtype=np.bool_, count=n
+        )
+        self.first_seen = np.fromiter(
+            (p.first_seen.timestamp() for p in products), dtype=np.float64, count=n
+        )
+
+        # Postings and sorted price order
+        self.category_rows = _group_rows(self.category_codes)
+        self.brand_rows = _group_rows(self.brand_codes)
+        self.price_order = np.argsort(self.prices, kind="stable")
+        self.sorted_prices = self.prices[self.price_order]
+        self._trigram_rows: Optional[Dict[str, np.ndarray]] = None  # built on first q
+        self._sort_orders: Dict[str, np.ndarray] = {"price_asc": self.price_order}
+
+    def __len__(self) -> int:
+        return len(self.products)
+
+    @staticmethod
+    def _encode_brands(products: List[Product]):
+        """Dictionary-encode lowercased brands (-1 = no brand)"""
+        brands: Dict[str, int] = {}
+        codes = [
+            brands.setdefault(p.brand.lower(), len(brands)) if p.brand else -1
+            for p in products
+        ]
+        dtype = np.int16 if len(brands) < np.iinfo(np.int16).max else np.int32
+        return list(brands), np.array(codes, dtype=dtype)
+
+    def filter_rows(self, filters: Dict[str, Any]) -> np.ndarray:
+        """
+        Return row numbers matching filters, in insertion order
+
+        The most selective indexed filter supplies the candidate rows; every
+        other filter is then checked only on those candidates
+        """
+        clauses: List[Clause] = []
+
+        if "category" in filters:
+            code = CATEGORY_CODES.get(filters["category"], -1)
+            category_rows = self.category_rows.get(code, NO_ROWS)
+            clauses.append(Clause(
+                len(category_rows),
+                lambda: category_rows,
+                [(self.category_codes, "==", code)]
+            ))
+
+        if "brand" in filters and filters["brand"]:
+            # Substring match runs once per distinct brand, not per product
+            brand = filters["brand"].lower()
+            codes = [code for code, name in enumerate(self.brands) if brand in name]
+            clauses.append(Clause(
+                sum(len(self.brand_rows[code]) for code in codes),
+                lambda: self._brand_posting(codes),
+                [self._brand_predicate(codes)]
+            ))
+
+        min_price = filters.get("min_price")
+        max_price = filters.get("max_price")
+        if min_price is not None or max_price is not None:
+            lo, hi = self._price_bounds(min_price, max_price)
+            price_predicates = []
+            if min_price is not None:
+                price_predicates.append((self.prices, ">=", min_price))
+            if max_price is not None:
+                price_predicates.append((self.prices, "<=", max_price))
+            # Wide ranges are cheaper as a comparison than sorting their rows
+            narrow = hi - lo <= PRICE_POSTING_MAX_SHARE * len(self)
+            clauses.append(Clause(
+                hi - lo,
+                (lambda: np.sort(self.price_order[lo:hi])) if narrow else None,
+                price_predicates
+            ))
+
+        if "min_rating" in filters and filters["min_rating"] is not None:
+            clauses.append(Clause(len(self), None, [
+                (self.has_ratings, None, None),
+                (self.ratings, ">=", filters["min_rating"])
+            ]))
+
+        if "in_stock_only" in filters and filters["in_stock_only"]:
+            clauses.append(Clause(len(self), None, [(self.in_stock, None, None)]))
+
+        indexed = [clause for clause in clauses if clause.posting is not None]
+        if indexed:
+            driver = min(indexed, key=lambda clause: clause.size)
+            rows = driver.posting()
+            predicates = [
+                (column[rows], op, value)
+                for clause in clauses if clause is not driver
+                for column, op, value in clause.predicates
+            ]
+            if predicates and len(rows):
+                rows = rows[self._combine(predicates, len(rows))]
+        else:
+            predicates = [predicate for clause in clauses for predicate in clause.predicates]
+            if predicates:
+                rows = np.flatnonzero(self._combine(predicates, len(self)))
+            else:
+                rows = np.arange(len(self))
+
+        # Text search last - it is the only check that touches Product objects
+        if "q" in filters and filters["q"]:
+            rows = self._query_rows(filters["q"].lower(), rows)
+
+        return rows
+
+    def _brand_predicate(self, codes: List[int]) -> Predicate:
+        """Brand filter as a code comparison, or a bitmap lookup for several codes"""
+        if len(codes) == 1:
+            return (self.brand_codes, "==", codes[0])
+
+        # One slot per brand plus a trailing False slot, which code -1
+        # (no brand) lands on through negative indexing
+        bitmap = np.zeros(len(self.brands) + 1, dtype=np.bool_)
+        bitmap[codes] = True
+        return (self.brand_codes, "in", bitmap)
+
+    def _brand_posting(self, codes: List[int]) -> np.ndarray:
+        """Sorted rows having any of the brand codes"""
+        if not codes:
+            return NO_ROWS
+        return np.sort(np.concatenate([self.brand_rows[code] for code in codes]))
+
+    def _price_bounds(self, min_price: Optional[float], max_price: Optional[float]) -> Tuple[int, int]:
+        """Slice of the price order covering a price range"""
+        lo = 0 if min_price is None else np.searchsorted(self.sorted_prices, min_price, side="left")
+        # Searching for +inf rather than taking the end keeps NaN prices out
+        hi = np.searchsorted(
+            self.sorted_prices,
+            np.inf if max_price is None else max_price,
+            side="right"
+        )
+        return int(lo), int(hi)
+
+    def _query_rows(self, query: str, rows: np.ndarray) -> np.ndarray:
+        """Narrow rows to those whose text fields contain query"""
+        if len(query) >= TRIGRAM and len(rows):
+            # A substring shares all its trigrams with the field containing it
+            trigram_rows = self._get_trigram_rows()
+            postings = [trigram_rows.get(gram, NO_ROWS) for gram in _trigrams(query)]
+            postings.append(rows)
+            postings.sort(key=len)  # smallest first keeps every intersection small
+            rows = reduce(lambda a, b: np.intersect1d(a, b, assume_unique=True), postings)
+
+        # Trigram hits can come from different fields/positions, so verify
+        if BLOB_SEPARATOR in query:
+            # Would match across fields in a blob - check fields one by one
+            matches = (_matches_query(self.products[row], query) for row in rows.tolist())
+        elif len(rows) == len(self):
+            matches = (query in blob for blob in self.search_blobs)
+        else:
+            matches = (query in self.search_blobs[row] for row in rows.tolist())
+
+        keep = np.fromiter(matches, dtype=np.bool_, count=len(rows))
+        return rows[keep]
+
+    def _get_trigram_rows(self) -> Dict[str, np.ndarray]:
+        """Trigram postings over lowercased text fields (built lazily)"""
+        if self._trigram_rows is None:
+            postings: Dict[str, List[int]] = {}
+            for row, blob in enumerate(self.search_blobs):
+                for gram in _trigrams(blob):
+                    postings.setdefault(gram, []).append(row)
+
+            self._trigram_rows = {
+                gram: np.array(found, dtype=np.intp) for gram, found in postings.items()
+            }
+        return self._trigram_rows
+
+    def _combine(self, predicates: List[Predicate], n: int) -> np.ndarray:
+        """AND predicates into one mask without per-predicate temporaries"""
+        if not predicates:
+            return np.ones(n, dtype=np.bool_)
+
+        if NUMEXPR_AVAILABLE and n >= NUMEXPR_MIN_ROWS and ne.get_num_threads() > 1:
+            # Single fused pass over all columns
+            terms = []
+            local_dict = {}
+            for i, (column, op, value) in enumerate(predicates):
+                local_dict[f"c{i}"] = column
+                if op == "in":
+                    local_dict[f"c{i}"] = value[column]  # no numexpr equivalent
+                    terms.append(f"c{i}")
+                elif op is None:
+                    terms.append(f"c{i}")
+                else:
+                    local_dict[f"v{i}"] = value
+                    terms.append(f"(c{i} {op} v{i})")
+            return ne.evaluate(" & ".join(terms), local_dict=local_dict)
+
+        # NumPy: one mask plus one scratch buffer reused by every comparison
+        mask = np.ones(n, dtype=np.bool_)
+        scratch = np.empty(n, dtype=np.bool_)
+        for column, op, value in predicates:
+            if op is None:
+                mask &= column
+            elif op == "in":
+                mask &= value[column]
+            else:
+                COMPARISONS[op](column, value, out=scratch)
+                mask &= scratch
+        return mask
+
+    def sort_rows(
+        self,
+        rows: np.ndarray,
+        sort_by: str,
+        limit: Optional[int] = None
+    ) -> np.ndarray:
+        """
+        Order rows by sort key (stable, so ties keep insertion order)
+
+        With `limit`, only the first `limit` rows of the ordering are returned
+        and rows that cannot reach them are never sorted
+        """
+        if sort_by not in SORT_COLUMNS:
+            return rows[:limit]
+
+        if (
+            len(self) > SORT_PERMUTATION_MIN_ROWS
+            and len(rows) >= SORT_PERMUTATION_MIN_SHARE * len(self)
+        ):
+            return self._rows_in_sort_order(rows, sort_by, limit)
+
+        attribute, descending = SORT_COLUMNS[sort_by]
+        keys = getattr(self, attribute)[rows]
+        if descending:
+            keys = -keys
+
+        if limit is not None and 0 < limit < len(rows) // 4:
+            # Keep everything up to the limit-th smallest key, including all
+            # ties with it, so the stable sort below still decides tie order
+            kth = np.partition(keys, limit - 1)[limit - 1]
+            head = np.flatnonzero(keys <= kth)
+            rows, keys = rows[head], keys[head]
+
+        return rows[np.argsort(keys, kind="stable")][:limit]
+
+    def _rows_in_sort_order(
+        self,
+        rows: np.ndarray,
+        sort_by: str,
+        limit: Optional[int]
+    ) -> np.ndarray:
+        """
+        Pick rows out of the precomputed full sort order
+
+        A stable full-catalog order restricted to ascending rows is exactly
+        the stable sort of those rows. With a limit, the order is walked in
+        growing chunks until enough rows are found.
+        """
+        order = self._get_sort_order(sort_by)
+        member = np.zeros(len(self), dtype=np.bool_)
+        member[rows] = True
+
+        if limit is None or limit <= 0 or limit >= len(rows):
+            return order[member[order]][:limit]
+
+        # Size the first chunk to hold ~2x limit matches at this density
+        chunk = max(2 * limit * len(self) // len(rows), 256)
+        found = []
+        count = start = 0
+        while count < limit and start < len(order):
+            part = order[start:start + chunk]
+            hits = part[member[part]]
+            found.append(hits)
+            count += len(hits)
+            start += chunk
+            chunk *= 2
+
+        return np.concatenate(found)[:limit]
+
+    def _get_sort_order(self, sort_by: str) -> np.ndarray:
+        """Stable full-catalog order for a sort key (built on first use)"""
+        if sort_by not in self._sort_orders:
+            attribute, descending = SORT_COLUMNS[sort_by]
+            column = getattr(self, attribute)
+            self._sort_orders[sort_by] = np.argsort(
+                -column if descending else column, kind="stable"
+            )
+        return self._sort_orders[sort_by]
+
+    def materialize(self, rows: np.ndarray) -> List[Product]:
+        """Look up Product objects for rows"""
+        return [self.products[row] for row in rows]
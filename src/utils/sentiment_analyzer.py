@@ -3,10 +3,14 @@ Review Sentiment Analyzer
 Analyzes product reviews to extract sentiment and key pros/cons
 """
 
-from typing import List, Tuple
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
 from collections import Counter
 import re
 
+import numpy as np
+
 try:
     from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
     VADER_AVAILABLE = True
@@ -16,10 +20,51 @@ except ImportError:
 from src.models.product import ReviewSentiment
 
 
+# Below this many reviews per call, per-review VADER scoring is cheap enough
+LEXICON_BATCH_MIN = 32
+
+# VADER's compound normalization constant
+VADER_ALPHA = 15
+
+TOKEN_RE = re.compile(r"[\w']+")
+
+
 class SentimentAnalyzer:
     """Analyze product review sentiment"""
     
-    def __init__(self):
+    # Common positive phrases
+    POSITIVE_PATTERNS = [re.compile(pattern) for pattern in (
+        r'great (\w+)',
+        r'excellent (\w+)',
+        r'love the (\w+)',
+        r'perfect (\w+)',
+        r'amazing (\w+)',
+        r'good (\w+)',
+        r'fast (\w+)',
+        r'easy to (\w+)',
+    )]
+    
+    # Common negative phrases
+    NEGATIVE_PATTERNS = [re.compile(pattern) for pattern in (
+        r'poor (\w+)',
+        r'terrible (\w+)',
+        r'bad (\w+)',
+        r'disappointing (\w+)',
+        r'slow (\w+)',
+        r'difficult to (\w+)',
+        r'does not (\w+)',
+        r'doesn\'t (\w+)',
+    )]
+    
+    def __init__(self, approximate_batches: bool = False):
+        """
+        Args:
+            approximate_batches: Score large review batches with a vectorized
+                VADER-lexicon sum instead of full VADER (faster, but ignores
+                VADER's negation/intensifier/punctuation rules)
+        """
+        self.approximate_batches = approximate_batches
+        
         if VADER_AVAILABLE:
             self.analyzer = SentimentIntensityAnalyzer()
         else:
@@ -53,14 +98,15 @@ class SentimentAnalyzer:
             )
         
         # Analyze sentiment
-        sentiments = []
-        for review in reviews:
-            sentiment = self._analyze_single_review(review)
-            sentiments.append(sentiment)
+        if self.analyzer and self.approximate_batches and len(reviews) >= LEXICON_BATCH_MIN:
+            sentiments = self._analyze_batch_lexicon(reviews)
+        else:
+            sentiments = [self._analyze_single_review(review) for review in reviews]
         
         # Calculate percentages
-        positive_count = sum(1 for s in sentiments if s == 'positive')
-        negative_count = sum(1 for s in sentiments if s == 'negative')
+        counts = Counter(sentiments)
+        positive_count = counts['positive']
+        negative_count = counts['negative']
         neutral_count = len(sentiments) - positive_count - negative_count
         
         total = len(sentiments)
@@ -112,36 +158,36 @@ class SentimentAnalyzer:
             else:
                 return 'neutral'
     
+    def _analyze_batch_lexicon(self, reviews: List[str]) -> List[str]:
+        """
+        Approximate VADER over a batch: sum lexicon valences per review and
+        apply VADER's compound normalization and thresholds, vectorized
+        """
+        lexicon = self.analyzer.lexicon
+        tokens = [TOKEN_RE.findall(review.lower()) for review in reviews]
+        
+        lengths = np.fromiter(map(len, tokens), dtype=np.intp, count=len(reviews))
+        valences = np.fromiter(
+            (lexicon.get(token, 0.0) for review_tokens in tokens for token in review_tokens),
+            dtype=np.float64,
+            count=int(lengths.sum())
+        )
+        review_ids = np.repeat(np.arange(len(reviews)), lengths)
+        totals = np.bincount(review_ids, weights=valences, minlength=len(reviews))
+        
+        compound = totals / np.sqrt(totals * totals + VADER_ALPHA)
+        labels = np.where(
+            compound >= 0.05,
+            'positive',
+            np.where(compound <= -0.05, 'negative', 'neutral')
+        )
+        return labels.tolist()
+    
     def _extract_pros_cons(
         self,
         reviews: List[str]
     ) -> Tuple[List[str], List[str]]:
         """Extract common pros and cons from reviews"""
-        
-        # Common positive phrases
-        positive_patterns = [
-            r'great (\w+)',
-            r'excellent (\w+)',
-            r'love the (\w+)',
-            r'perfect (\w+)',
-            r'amazing (\w+)',
-            r'good (\w+)',
-            r'fast (\w+)',
-            r'easy to (\w+)',
-        ]
-        
-        # Common negative phrases
-        negative_patterns = [
-            r'poor (\w+)',
-            r'terrible (\w+)',
-            r'bad (\w+)',
-            r'disappointing (\w+)',
-            r'slow (\w+)',
-            r'difficult to (\w+)',
-            r'does not (\w+)',
-            r'doesn\'t (\w+)',
-        ]
-        
         pros = []
         cons = []
         
@@ -149,14 +195,12 @@ class SentimentAnalyzer:
             review_lower = review.lower()
             
             # Extract pros
-            for pattern in positive_patterns:
-                matches = re.findall(pattern, review_lower)
-                pros.extend(matches)
+            for pattern in self.POSITIVE_PATTERNS:
+                pros.extend(pattern.findall(review_lower))
             
             # Extract cons
-            for pattern in negative_patterns:
-                matches = re.findall(pattern, review_lower)
-                cons.extend(matches)
+            for pattern in self.NEGATIVE_PATTERNS:
+                cons.extend(pattern.findall(review_lower))
         
         # Count and get top items
         if pros:
@@ -179,19 +223,28 @@ class SentimentAnalyzer:
         sentiments: List[str]
     ) -> List[str]:
         """Get representative sample reviews"""
-        samples = []
+        # Get one positive, one neutral, one negative (first of each, one pass)
+        first_by_sentiment = {}
+        for review, sentiment in zip(reviews, sentiments):
+            first_by_sentiment.setdefault(sentiment, review)
+            if len(first_by_sentiment) == 3:
+                break
         
-        # Get one positive, one neutral, one negative
-        for sentiment_type in ['positive', 'neutral', 'negative']:
-            for review, sentiment in zip(reviews, sentiments):
-                if sentiment == sentiment_type and review not in samples:
-                    samples.append(review[:200])  # Truncate long reviews
-                    break
+        samples = [
+            first_by_sentiment[sentiment_type][:200]  # Truncate long reviews
+            for sentiment_type in ['positive', 'neutral', 'negative']
+            if sentiment_type in first_by_sentiment
+        ]
         
         # Fill up to 5 samples
+        seen = set(samples)
         for review in reviews:
-            if review[:200] not in samples and len(samples) < 5:
-                samples.append(review[:200])
+            if len(samples) >= 5:
+                break
+            truncated = review[:200]
+            if truncated not in seen:
+                samples.append(truncated)
+                seen.add(truncated)
         
         return samples
 
@@ -203,6 +256,34 @@ def analyze_product_reviews(reviews: List[str]) -> ReviewSentiment:
     return analyzer.analyze_reviews(reviews)
 
 
+async def analyze_reviews_batch(
+    review_lists: List[List[str]],
+    max_workers: Optional[int] = None
+) -> List[ReviewSentiment]:
+    """
+    Analyze reviews for many products in worker processes
+    
+    Sentiment scoring is CPU-bound; running it in a process pool keeps the
+    event loop free and uses every core.
+    
+    Args:
+        review_lists: One list of review texts per product
+        max_workers: Process count (defaults to CPU count)
+        
+    Returns:
+        ReviewSentiment per product, in input order
+    """
+    if not review_lists:
+        return []
+    
+    loop = asyncio.get_running_loop()
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        return await asyncio.gather(*[
+            loop.run_in_executor(pool, analyze_product_reviews, reviews)
+            for reviews in review_lists
+        ])
+
+
 # CLI for testing
 if __name__ == "__main__":
     # Test reviews
@@ -0,0 +1,108 @@
+"""
+Round-trip tests for the compressed price history codec
+"""
+
+import math
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.models.product import Currency, PricePoint
+from src.utils.price_history import PriceSeries, decode_points, encode_points
+
+
+BASE = datetime(2026, 1, 1)
+
+
+def _key(point: PricePoint) -> tuple:
+    return (point.date, point.price, Currency(point.currency), point.source)
+
+
+def _round_trip(points):
+    labels = []
+    data = encode_points(points, labels)
+    return decode_points(data, len(points), labels)
+
+
+def _point(offset: timedelta, price: float, source: str = "Amazon", currency=Currency.USD) -> PricePoint:
+    return PricePoint(date=BASE + offset, price=price, currency=currency, source=source)
+
+
+@pytest.mark.parametrize("points", [
+    # Single point
+    [_point(timedelta(0), 19.99)],
+    # Regular intervals and repeated prices (zero delta-of-delta, zero XOR)
+    [_point(timedelta(hours=i), 10.0) for i in range(50)],
+    # Every delta-of-delta bucket, including the 64-bit fallback
+    [_point(timedelta(microseconds=us), 1.0) for us in (0, 1, 100, 300, 2_000, 2_000_000, 10**12, 10**12 + 5)],
+    # Timestamps going backwards (negative deltas)
+    [_point(timedelta(days=d), 5.0) for d in (10, 3, 7, 0)],
+    # Prices hitting the leading-zero cap and full 64-bit meaningful XOR
+    [_point(timedelta(seconds=i), price) for i, price in enumerate(
+        [0.0, 5e-324, 1.0, -1.0, 1e308, -5e-324, 2.0, 3.0, math.inf, 0.0, 1234.5678]
+    )],
+    # Label changes mid-stream
+    [
+        _point(timedelta(minutes=i), 9.99, source=source, currency=currency)
+        for i, (source, currency) in enumerate([
+            ("Amazon", Currency.USD), ("Amazon", Currency.USD), ("eBay", Currency.GBP),
+            ("Amazon", Currency.USD), ("Walmart", Currency.EUR), ("Walmart", Currency.EUR),
+        ])
+    ],
+])
+def test_encode_decode_round_trip(points):
+    assert [_key(pp) for pp in _round_trip(points)] == [_key(pp) for pp in points]
+
+
+def test_random_round_trip():
+    rng = random.Random(0)
+    points = [
+        _point(
+            timedelta(seconds=rng.randint(-10**9, 10**9)),
+            rng.choice([round(rng.uniform(0, 5000), 2), rng.random(), 0.0]),
+            source=rng.choice(["Amazon", "eBay", "Walmart"]),
+            currency=rng.choice(list(Currency))
+        )
+        for _ in range(2000)
+    ]
+    assert [_key(pp) for pp in _round_trip(points)] == [_key(pp) for pp in points]
+
+
+def test_shared_label_table():
+    labels = []
+    first = [_point(timedelta(0), 1.0, source="Amazon")]
+    second = [_point(timedelta(0), 2.0, source="eBay"), _point(timedelta(1), 3.0, source="Amazon")]
+    first_data = encode_points(first, labels)
+    second_data = encode_points(second, labels)
+
+    assert labels == [(Currency.USD, "Amazon"), (Currency.USD, "eBay")]
+    assert [_key(pp) for pp in decode_points(first_data, 1, labels)] == [_key(pp) for pp in first]
+    assert [_key(pp) for pp in decode_points(second_data, 2, labels)] == [_key(pp) for pp in second]
+
+
+def test_series_points_and_append():
+    rng = random.Random(1)
+    points = [
+        _point(timedelta(days=d, hours=rng.randint(0, 23)), round(rng.uniform(10, 20), 2))
+        for d in range(120)
+    ]
+    series = PriceSeries(points[:100])
+    for point in points[100:]:
+        series.append(point)
+
+    assert len(series) == len(points)
+    assert [_key(pp) for pp in series.points()] == [_key(pp) for pp in points]
+
+    since = BASE + timedelta(days=60, hours=12)
+    expected = [_key(pp) for pp in points if pp.date >= since]
+    assert [_key(pp) for pp in series.points(since=since)] == expected
+
+
+def test_series_contains():
+    points = [_point(timedelta(days=d), 10.0 + d) for d in range(10)]
+    series = PriceSeries(points)
+
+    assert points[4] in series
+    assert _point(timedelta(days=4), 99.0) not in series
+    assert _point(timedelta(days=40), 10.0) not in series